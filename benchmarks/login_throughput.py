@@ -0,0 +1,66 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+parser = argparse.ArgumentParser(description='Login throughput under concurrent load in one gthread worker process')
+parser.add_argument('--threads', type=int, default=8, help='request threads, like gunicorn --threads')
+parser.add_argument('--logins', type=int, default=20, help='logins per thread')
+parser.add_argument('--users', type=int, default=8)
+args = parser.parse_args()
+
+db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+os.environ.setdefault('SECRET_KEY', 'bench')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+main.app.config['WTF_CSRF_ENABLED'] = False
+
+setup_client = main.app.test_client()
+for i in range(args.users):
+    setup_client.post('/register', data={
+        'username': f'bench{i}',
+        'email': f'bench{i}@example.com',
+        'password': 'benchmark',
+        'confirm_password': 'benchmark',
+    })
+
+latencies = []
+statuses = {}
+lock = threading.Lock()
+
+
+def worker(index):
+    email = f'bench{index % args.users}@example.com'
+    for _ in range(args.logins):
+        client = main.app.test_client()
+        started = time.perf_counter()
+        response = client.post('/login', data={'email': email, 'password': 'benchmark'})
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+started = time.perf_counter()
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+wall = time.perf_counter() - started
+
+latencies.sort()
+print(f"hash method: {main.app.config['PASSWORD_HASH_METHOD']}")
+print(f"hash workers: {main.app.config['AUTH_HASH_WORKERS']}, queue: {main.app.config['AUTH_HASH_QUEUE']}, "
+      f"worker threads: {main.app.config['WORKER_THREADS']}")
+print(f'threads: {args.threads}, logins: {len(latencies)}, wall: {wall:.2f}s')
+print(f'throughput: {len(latencies) / wall:.1f} logins/s')
+print(f'p50: {statistics.median(latencies) * 1000:.1f}ms, '
+      f'p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms')
+print(f'status codes: {dict(sorted(statuses.items()))}')
@@ -0,0 +1,90 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+parser = argparse.ArgumentParser(description='Latency of normal users while one user floods the write routes')
+parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory')
+parser.add_argument('--duration', type=float, default=5.0, help='seconds per run')
+parser.add_argument('--abusers', type=int, default=4, help='threads flooding toggle_todo as one user')
+parser.add_argument('--users', type=int, default=4, help='normal users browsing the dashboard')
+args = parser.parse_args()
+
+tmp_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp_dir, 'bench.db')
+os.environ['RATE_LIMIT_BACKEND'] = args.backend
+os.environ['RATE_LIMIT_SQLITE_PATH'] = os.path.join(tmp_dir, 'ratelimit.db')
+os.environ.setdefault('SECRET_KEY', 'bench')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+main.app.config['WTF_CSRF_ENABLED'] = False
+
+
+def logged_in_client(name):
+    client = main.app.test_client()
+    client.post('/register', data={'username': name, 'email': f'{name}@example.com',
+                                   'password': 'benchmark', 'confirm_password': 'benchmark'})
+    client.post('/login', data={'email': f'{name}@example.com', 'password': 'benchmark'})
+    return client
+
+
+abuser = logged_in_client('abuser')
+abuser.post('/todos/new', data={'title': 'flood'})
+with main.app.app_context():
+    flood_todo_id = main.Todo.query.filter_by(title='flood').first().id
+users = [logged_in_client(f'user{i}') for i in range(args.users)]
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def run(limited):
+    main.app.config['RATE_LIMIT_ENABLED'] = limited
+    stop = time.perf_counter() + args.duration
+    latencies = []
+    abuser_statuses = {}
+    lock = threading.Lock()
+    
+    def flood():
+        while time.perf_counter() < stop:
+            status = abuser.post(f'/todos/{flood_todo_id}/toggle').status_code
+            with lock:
+                abuser_statuses[status] = abuser_statuses.get(status, 0) + 1
+    
+    def browse(client):
+        count = 0
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            if count % 10 == 0:
+                client.post('/todos/new', data={'title': 'normal'})
+            else:
+                client.get('/dashboard')
+            with lock:
+                latencies.append(time.perf_counter() - started)
+            count += 1
+            time.sleep(0.02)
+    
+    threads = [threading.Thread(target=flood) for _ in range(args.abusers)]
+    threads += [threading.Thread(target=browse, args=(client,)) for client in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    latencies.sort()
+    print(f"limiter {'on ' if limited else 'off'}: normal users {len(latencies)} requests, "
+          f'p50 {percentile(latencies, 0.50):.1f}ms, p95 {percentile(latencies, 0.95):.1f}ms, '
+          f'p99 {percentile(latencies, 0.99):.1f}ms; abuser {dict(sorted(abuser_statuses.items()))}')
+
+
+print(f'backend: {args.backend}, rate: {main.app.config["RATE_LIMIT_RATE"]}/s, '
+      f'burst: {main.app.config["RATE_LIMIT_BURST"]}, max concurrent writes: {main.app.config["MAX_CONCURRENT_WRITES"]}')
+run(limited=False)
+run(limited=True)
+print(main.app.test_client().get('/metrics').get_data(as_text=True))
@@ -1,16 +1,50 @@
 import os
+import math
+import time
+import sqlite3
+import zlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from itertools import chain
 from urllib.parse import urlparse
-from flask import Flask, render_template, redirect, url_for, flash, request, jsonify
+from flask import Flask, render_template, stream_template, redirect, url_for, flash, request, jsonify, g
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from flask_wtf.csrf import CSRFProtect
+from flask_wtf.csrf import CSRFProtect, generate_csrf
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from werkzeug.exceptions import TooManyRequests, ServiceUnavailable
+from sqlalchemy.exc import IntegrityError
+import click
+import brotli
+from datetime import datetime, timedelta
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SESSION_SECRET', os.environ.get('SECRET_KEY'))
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['STREAM_LIST_VIEWS'] = os.environ.get('STREAM_LIST_VIEWS', '1') == '1'
+app.config['STREAM_CHUNK_SIZE'] = int(os.environ.get('STREAM_CHUNK_SIZE', '4096'))
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', '6'))
+app.config['BROTLI_QUALITY'] = int(os.environ.get('BROTLI_QUALITY', '4'))
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+app.config['AUTH_HASH_WORKERS'] = int(os.environ.get('AUTH_HASH_WORKERS', '2'))
+app.config['AUTH_HASH_QUEUE'] = int(os.environ.get('AUTH_HASH_QUEUE', '2'))
+app.config['WORKER_THREADS'] = int(os.environ.get('WORKER_THREADS', '8'))
+app.config['AUTH_HASH_TIMEOUT'] = float(os.environ.get('AUTH_HASH_TIMEOUT', '10'))
+app.config['ROLLUP_BATCH_SIZE'] = int(os.environ.get('ROLLUP_BATCH_SIZE', '1000'))
+app.config['ROLLUP_LAG_SECONDS'] = int(os.environ.get('ROLLUP_LAG_SECONDS', '60'))
+app.config['ARCHIVE_TODO_AGE_DAYS'] = int(os.environ.get('ARCHIVE_TODO_AGE_DAYS', '30'))
+app.config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', '500'))
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+app.config['RATE_LIMIT_BACKEND'] = os.environ.get('RATE_LIMIT_BACKEND', 'sqlite')
+app.config['RATE_LIMIT_SQLITE_PATH'] = os.environ.get('RATE_LIMIT_SQLITE_PATH', '/tmp/devnotebook-ratelimit.db')
+app.config['RATE_LIMIT_RATE'] = float(os.environ.get('RATE_LIMIT_RATE', '2'))
+app.config['RATE_LIMIT_BURST'] = int(os.environ.get('RATE_LIMIT_BURST', '20'))
+app.config['MAX_CONCURRENT_WRITES'] = int(os.environ.get('MAX_CONCURRENT_WRITES', '4'))
+app.config['WRITE_SLOT_TTL'] = int(os.environ.get('WRITE_SLOT_TTL', '30'))
 
 db = SQLAlchemy(app)
 csrf = CSRFProtect(app)
@@ -19,6 +53,20 @@ login_manager.login_view = 'login'
 login_manager.login_message = 'Bu sayfayı görüntülemek için giriş yapmalısınız.'
 login_manager.login_message_category = 'error'
 
+perf_logger = logging.getLogger('devnotebook.perf')
+
+COMPRESSIBLE_MIMETYPES = ['text/html', 'text/plain', 'application/json']
+
+hash_executor = ThreadPoolExecutor(max_workers=app.config['AUTH_HASH_WORKERS'], thread_name_prefix='auth-hash')
+# Logins may occupy at most half of a worker's request threads (running or
+# queued for a hash), so the rest stay free for pages during a burst.
+hash_slots = threading.BoundedSemaphore(max(1, min(app.config['AUTH_HASH_WORKERS'] + app.config['AUTH_HASH_QUEUE'],
+                                                   app.config['WORKER_THREADS'] // 2)))
+
+
+class AuthBusyError(Exception):
+    pass
+
 
 def is_safe_url(target):
     if not target:
@@ -28,6 +76,271 @@ def is_safe_url(target):
     return test_url.scheme in ('', 'http', 'https') and ref_url.netloc == test_url.netloc
 
 
+@lru_cache(maxsize=None)
+def password_hash_prefix(method):
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+def duplicate_user_field(error):
+    constraint = getattr(getattr(error.orig, 'diag', None), 'constraint_name', None)
+    if constraint:
+        return 'email' if constraint == 'users_email_key' else 'username'
+    return 'email' if 'users.email' in str(error.orig) else 'username'
+
+
+def run_hash_job(func, *args):
+    if not hash_slots.acquire(blocking=False):
+        raise AuthBusyError()
+    try:
+        future = hash_executor.submit(func, *args)
+    except BaseException:
+        hash_slots.release()
+        raise
+    # The slot is held until the hash really finishes, even if the
+    # request stops waiting for it after a timeout.
+    future.add_done_callback(lambda _: hash_slots.release())
+    return future.result(timeout=app.config['AUTH_HASH_TIMEOUT'])
+
+
+def buffer_chunks(chunks, size):
+    buffered = []
+    buffered_size = 0
+    for chunk in chunks:
+        buffered.append(chunk)
+        buffered_size += len(chunk)
+        if buffered_size >= size:
+            yield ''.join(buffered)
+            buffered = []
+            buffered_size = 0
+    if buffered:
+        yield ''.join(buffered)
+
+
+def render_list(template_name, **context):
+    if not app.config['STREAM_LIST_VIEWS']:
+        return render_template(template_name, **context)
+    # The session cookie is written before the body streams, so the CSRF
+    # token used by the forms in the page must exist up front.
+    generate_csrf()
+    chunks = stream_template(template_name, **context)
+    return app.response_class(buffer_chunks(chunks, app.config['STREAM_CHUNK_SIZE']), mimetype='text/html')
+
+
+def compress_chunks(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=app.config['BROTLI_QUALITY'])
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(app.config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def peek_chunks(chunks, size):
+    head = []
+    head_size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        head_size += len(chunk)
+        if head_size >= size:
+            break
+    return b''.join(head), head_size >= size
+
+
+def measure_chunks(chunks, started, summary):
+    first_byte_at = None
+    sent = 0
+    try:
+        for chunk in chunks:
+            if first_byte_at is None:
+                first_byte_at = time.perf_counter()
+            sent += len(chunk)
+            yield chunk
+    finally:
+        finished_at = time.perf_counter()
+        ttfb = (first_byte_at or finished_at) - started
+        perf_logger.info('%s ttfb=%.1fms total=%.1fms bytes=%d',
+                         summary, ttfb * 1000, (finished_at - started) * 1000, sent)
+
+
+class MemoryLimiterBackend:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.slots = 0
+        self.counters = {'allowed': 0, 'rejected_rate': 0, 'rejected_concurrency': 0}
+    
+    def take_token(self, key, rate, burst):
+        now = time.monotonic()
+        with self.lock:
+            if len(self.buckets) > 10000:
+                idle = burst / rate
+                self.buckets = {k: v for k, v in self.buckets.items() if now - v[1] < idle}
+            tokens, updated = self.buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now)
+                self.counters['rejected_rate'] += 1
+                return (1 - tokens) / rate
+            self.buckets[key] = (tokens - 1, now)
+            return 0
+    
+    def refund_token(self, key, burst):
+        with self.lock:
+            if key in self.buckets:
+                tokens, updated = self.buckets[key]
+                self.buckets[key] = (min(burst, tokens + 1), updated)
+    
+    def acquire_slot(self, limit):
+        with self.lock:
+            if self.slots >= limit:
+                self.counters['rejected_concurrency'] += 1
+                return None
+            self.slots += 1
+            self.counters['allowed'] += 1
+            return True
+    
+    def release_slot(self, slot):
+        with self.lock:
+            self.slots -= 1
+    
+    def metrics(self):
+        with self.lock:
+            return dict(self.counters, slots_in_use=self.slots)
+
+
+class SQLiteLimiterBackend:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self.connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS slots (id INTEGER PRIMARY KEY AUTOINCREMENT, expires REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)')
+    
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            self.local.conn = conn
+        return conn
+    
+    def transaction(self):
+        conn = self.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        return conn
+    
+    def count(self, conn, name):
+        conn.execute('INSERT INTO counters (name, value) VALUES (?, 1) '
+                     'ON CONFLICT(name) DO UPDATE SET value = value + 1', (name,))
+    
+    def take_token(self, key, rate, burst):
+        now = time.time()
+        conn = self.transaction()
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens < 1:
+                retry_after = (1 - tokens) / rate
+                self.count(conn, 'rejected_rate')
+            else:
+                retry_after = 0
+                tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, tokens, now))
+            if row is None:
+                # A bucket idle for burst / rate seconds is full again, same as a missing row.
+                conn.execute('DELETE FROM buckets WHERE updated < ?', (now - burst / rate,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return retry_after
+    
+    def refund_token(self, key, burst):
+        self.connect().execute('UPDATE buckets SET tokens = MIN(tokens + 1, ?) WHERE key = ?', (burst, key))
+    
+    def acquire_slot(self, limit):
+        now = time.time()
+        conn = self.transaction()
+        try:
+            conn.execute('DELETE FROM slots WHERE expires < ?', (now,))
+            in_use = conn.execute('SELECT COUNT(*) FROM slots').fetchone()[0]
+            if in_use >= limit:
+                slot = None
+                self.count(conn, 'rejected_concurrency')
+            else:
+                slot = conn.execute('INSERT INTO slots (expires) VALUES (?)',
+                                    (now + app.config['WRITE_SLOT_TTL'],)).lastrowid
+                self.count(conn, 'allowed')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return slot
+    
+    def release_slot(self, slot):
+        self.connect().execute('DELETE FROM slots WHERE id = ?', (slot,))
+    
+    def metrics(self):
+        conn = self.connect()
+        counters = {'allowed': 0, 'rejected_rate': 0, 'rejected_concurrency': 0}
+        counters.update(conn.execute('SELECT name, value FROM counters').fetchall())
+        counters['slots_in_use'] = conn.execute('SELECT COUNT(*) FROM slots WHERE expires >= ?',
+                                                (time.time(),)).fetchone()[0]
+        return counters
+
+
+def create_limiter_backend(name):
+    if name == 'sqlite':
+        return SQLiteLimiterBackend(app.config['RATE_LIMIT_SQLITE_PATH'])
+    return MemoryLimiterBackend()
+
+
+limiter = create_limiter_backend(app.config['RATE_LIMIT_BACKEND'])
+limiter_errors = 0
+
+
+def rate_limited(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        global limiter_errors
+        if request.method != 'POST' or not app.config['RATE_LIMIT_ENABLED']:
+            return view(*args, **kwargs)
+        
+        # The limiter fails open: a broken shared store must not take the
+        # write routes down with it.
+        key = f'user:{current_user.id}'
+        try:
+            retry_after = limiter.take_token(key, app.config['RATE_LIMIT_RATE'], app.config['RATE_LIMIT_BURST'])
+            slot = None if retry_after else limiter.acquire_slot(app.config['MAX_CONCURRENT_WRITES'])
+            # A write shed for lack of a slot was never served, so it should not
+            # cost the user part of their burst.
+            if not retry_after and slot is None:
+                limiter.refund_token(key, app.config['RATE_LIMIT_BURST'])
+        except sqlite3.Error:
+            limiter_errors += 1
+            return view(*args, **kwargs)
+        
+        if retry_after:
+            raise TooManyRequests('Çok fazla istek gönderdiniz, lütfen biraz bekleyin.',
+                                  retry_after=math.ceil(retry_after))
+        if slot is None:
+            raise ServiceUnavailable('Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.', retry_after=1)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            try:
+                limiter.release_slot(slot)
+            except sqlite3.Error:
+                limiter_errors += 1
+    
+    return wrapper
+
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
@@ -43,14 +356,21 @@ class User(UserMixin, db.Model):
     todos = db.relationship('Todo', backref='owner', lazy='dynamic', cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = run_hash_job(generate_password_hash, password, app.config['PASSWORD_HASH_METHOD'])
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return run_hash_job(check_password_hash, self.password_hash, password)
+    
+    @property
+    def password_needs_rehash(self):
+        method = self.password_hash.split('$', 1)[0]
+        return method != password_hash_prefix(app.config['PASSWORD_HASH_METHOD'])
 
 
 class Idea(db.Model):
     __tablename__ = 'ideas'
+    # Archived ideas keep their id; SQLite must not hand it out again.
+    __table_args__ = {'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -68,6 +388,8 @@ class Idea(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    is_archived = False
+    
     @property
     def status_color(self):
         colors = {
@@ -191,6 +513,7 @@ class Plan(db.Model):
 
 class Todo(db.Model):
     __tablename__ = 'todos'
+    __table_args__ = {'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -207,6 +530,8 @@ class Todo(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
     
+    is_archived = False
+    
     @property
     def priority_color(self):
         colors = {
@@ -232,6 +557,99 @@ class Todo(db.Model):
         return False
 
 
+class ArchivedIdea(db.Model):
+    __tablename__ = 'ideas_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    title = db.Column(db.String(200), nullable=False)
+    elevator_pitch = db.Column(db.Text)
+    problem_statement = db.Column(db.Text)
+    target_audience = db.Column(db.String(200))
+    unique_value = db.Column(db.Text)
+    tech_stack = db.Column(db.String(300))
+    
+    status = db.Column(db.String(20))
+    priority = db.Column(db.String(20))
+    
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    is_archived = True
+    status_color = Idea.status_color
+    status_label = Idea.status_label
+    priority_color = Idea.priority_color
+    priority_label = Idea.priority_label
+
+
+class ArchivedTodo(db.Model):
+    __tablename__ = 'todos_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    plan_id = db.Column(db.Integer, nullable=True, index=True)
+    
+    title = db.Column(db.String(300), nullable=False)
+    description = db.Column(db.Text)
+    
+    priority = db.Column(db.String(20))
+    is_completed = db.Column(db.Boolean)
+    due_date = db.Column(db.Date, nullable=True)
+    
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    plan = db.relationship('Plan', primaryjoin='foreign(ArchivedTodo.plan_id) == Plan.id', viewonly=True)
+    
+    is_archived = True
+    priority_color = Todo.priority_color
+    priority_label = Todo.priority_label
+    is_overdue = Todo.is_overdue
+
+
+class ActivityEvent(db.Model):
+    __tablename__ = 'activity_events'
+    __table_args__ = (db.Index('ix_activity_events_entity', 'entity_id', 'event_type'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    plan_id = db.Column(db.Integer, nullable=True)
+    
+    event_type = db.Column(db.String(30), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=True)
+    open_delta = db.Column(db.Integer, default=0, nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ActivityRollup(db.Model):
+    __tablename__ = 'activity_rollups'
+    __table_args__ = (db.UniqueConstraint('user_id', 'plan_id', 'day', name='uq_activity_rollups_scope'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # 0 is the user-wide scope; NULL would slip past the unique constraint.
+    plan_id = db.Column(db.Integer, nullable=False, default=0)
+    day = db.Column(db.Date, nullable=False)
+    
+    events = db.Column(db.Integer, default=0, nullable=False)
+    todos_created = db.Column(db.Integer, default=0, nullable=False)
+    todos_completed = db.Column(db.Integer, default=0, nullable=False)
+    todos_reopened = db.Column(db.Integer, default=0, nullable=False)
+    open_delta = db.Column(db.Integer, default=0, nullable=False)
+
+
+class RollupState(db.Model):
+    __tablename__ = 'rollup_state'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    last_event_id = db.Column(db.Integer, default=0, nullable=False)
+
+
 VALID_PLAN_STATUSES = ['planning', 'in_progress', 'on_hold', 'completed', 'cancelled']
 
 
@@ -240,6 +658,263 @@ def load_user(user_id):
     return User.query.get(int(user_id))
 
 
+def record_activity(event_type, plan_id=None, entity_id=None, open_delta=0, user_id=None):
+    db.session.add(ActivityEvent(
+        user_id=user_id or current_user.id,
+        plan_id=plan_id,
+        event_type=event_type,
+        entity_id=entity_id,
+        open_delta=open_delta
+    ))
+
+
+def rollup_activity(batch_size=None):
+    batch_size = batch_size or app.config['ROLLUP_BATCH_SIZE']
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config['ROLLUP_LAG_SECONDS'])
+    if db.session.get(RollupState, 'activity') is None:
+        db.session.add(RollupState(name='activity', last_event_id=0))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    
+    processed = 0
+    while True:
+        # A no-op write locks the state row (and takes SQLite's write lock), so
+        # overlapping runs wait for each other instead of counting events twice.
+        # The lock is taken again for every batch and released by its commit.
+        db.session.execute(db.update(RollupState).where(RollupState.name == 'activity')
+                           .values(last_event_id=RollupState.last_event_id))
+        state = db.session.get(RollupState, 'activity', populate_existing=True)
+        
+        batch = ActivityEvent.query.filter(ActivityEvent.id > state.last_event_id) \
+            .order_by(ActivityEvent.id).limit(batch_size).all()
+        # Stop at the first event that is still inside the lag window so a
+        # slow transaction holding a lower id cannot be skipped over.
+        events = []
+        for event in batch:
+            if event.created_at > cutoff:
+                break
+            events.append(event)
+        if not events:
+            db.session.commit()
+            break
+        
+        totals = {}
+        for event in events:
+            day = event.created_at.date()
+            scopes = [(event.user_id, 0, day)]
+            if event.plan_id:
+                scopes.append((event.user_id, event.plan_id, day))
+            for scope in scopes:
+                counts = totals.setdefault(scope, {'events': 0, 'todos_created': 0, 'todos_completed': 0,
+                                                   'todos_reopened': 0, 'open_delta': 0})
+                counts['events'] += 1
+                if event.event_type == 'todo_created':
+                    counts['todos_created'] += 1
+                elif event.event_type == 'todo_completed':
+                    counts['todos_completed'] += 1
+                elif event.event_type == 'todo_reopened':
+                    counts['todos_reopened'] += 1
+                counts['open_delta'] += event.open_delta
+        
+        rollups = {
+            (rollup.user_id, rollup.plan_id, rollup.day): rollup
+            for rollup in ActivityRollup.query.filter(
+                ActivityRollup.user_id.in_({scope[0] for scope in totals}),
+                ActivityRollup.plan_id.in_({scope[1] for scope in totals}),
+                ActivityRollup.day.in_({scope[2] for scope in totals})
+            )
+        }
+        for (user_id, plan_id, day), counts in totals.items():
+            rollup = rollups.get((user_id, plan_id, day))
+            if rollup is None:
+                rollup = ActivityRollup(user_id=user_id, plan_id=plan_id, day=day, events=0, todos_created=0,
+                                        todos_completed=0, todos_reopened=0, open_delta=0)
+                db.session.add(rollup)
+            rollup.events += counts['events']
+            rollup.todos_created += counts['todos_created']
+            rollup.todos_completed += counts['todos_completed']
+            rollup.todos_reopened += counts['todos_reopened']
+            rollup.open_delta += counts['open_delta']
+        
+        state.last_event_id = events[-1].id
+        db.session.commit()
+        processed += len(events)
+        if len(events) < len(batch):
+            break
+    
+    return processed
+
+
+def activity_series(user_id, plan_id=0, days=14):
+    start = datetime.utcnow().date() - timedelta(days=days - 1)
+    scope = ActivityRollup.query.filter_by(user_id=user_id, plan_id=plan_id)
+    remaining = scope.filter(ActivityRollup.day < start) \
+        .with_entities(db.func.coalesce(db.func.sum(ActivityRollup.open_delta), 0)).scalar()
+    rollups = {rollup.day: rollup for rollup in scope.filter(ActivityRollup.day >= start)}
+    
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        rollup = rollups.get(day)
+        if rollup:
+            remaining += rollup.open_delta
+        series.append({
+            'day': day.isoformat(),
+            'created': rollup.todos_created if rollup else 0,
+            # Net of reopens, so velocity agrees with the burndown's open_delta.
+            'completed': rollup.todos_completed - rollup.todos_reopened if rollup else 0,
+            'remaining': remaining
+        })
+    return series
+
+
+def copy_row(source, model, **values):
+    for column in model.__table__.columns:
+        if column.name not in values and hasattr(source, column.name):
+            values[column.name] = getattr(source, column.name)
+    return model(**values)
+
+
+def archive_cold_rows(batch_size=None):
+    batch_size = batch_size or app.config['ARCHIVE_BATCH_SIZE']
+    cutoff = datetime.utcnow() - timedelta(days=app.config['ARCHIVE_TODO_AGE_DAYS'])
+    jobs = [
+        (Todo, ArchivedTodo, [Todo.is_completed.is_(True), Todo.completed_at < cutoff, Todo.updated_at < cutoff]),
+        (Idea, ArchivedIdea, [Idea.status == 'archived']),
+    ]
+    moved = {}
+    skipped = {}
+    for model, archive_model, conditions in jobs:
+        moved[model.__tablename__] = 0
+        skipped[model.__tablename__] = 0
+        last_id = 0
+        while True:
+            rows = model.query.filter(model.id > last_id, *conditions).order_by(model.id).limit(batch_size) \
+                .with_for_update(skip_locked=True).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            # Databases created before sqlite_autoincrement may have handed an
+            # archived id to a newer hot row; that row stays hot rather than
+            # failing the whole batch on the archive's primary key.
+            taken = {archived_id for (archived_id,) in db.session.query(archive_model.id)
+                     .filter(archive_model.id.in_([row.id for row in rows]))}
+            rows = [row for row in rows if row.id not in taken]
+            if rows:
+                archived_at = datetime.utcnow()
+                db.session.add_all([copy_row(row, archive_model, archived_at=archived_at) for row in rows])
+                model.query.filter(model.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+            db.session.commit()
+            moved[model.__tablename__] += len(rows)
+            skipped[model.__tablename__] += len(taken)
+    return moved, skipped
+
+
+@app.cli.command('archive-cold')
+def archive_cold_command():
+    moved, skipped = archive_cold_rows()
+    click.echo(f"{moved['todos']} todos and {moved['ideas']} ideas moved to the archive.")
+    if skipped['todos'] or skipped['ideas']:
+        click.echo(f"{skipped['todos']} todos and {skipped['ideas']} ideas skipped: their ids are already in the archive.")
+
+
+@app.cli.command('rollup-activity')
+def rollup_activity_command():
+    processed = rollup_activity()
+    click.echo(f'{processed} activity events rolled up.')
+
+
+@app.cli.command('backfill-activity')
+def backfill_activity_command():
+    logged = db.session.query(ActivityEvent.entity_id).filter_by(event_type='todo_created')
+    added = 0
+    # Archived todos keep their original ids, so both tiers share the log.
+    for model in (Todo, ArchivedTodo):
+        last_id = 0
+        while True:
+            todos = model.query.filter(model.id.notin_(logged), model.id > last_id).order_by(model.id).limit(500).all()
+            if not todos:
+                break
+            logged_events = {}
+            for event in ActivityEvent.query.filter(
+                ActivityEvent.entity_id.in_([todo.id for todo in todos]),
+                ActivityEvent.event_type.in_(['todo_completed', 'todo_reopened', 'todo_moved'])
+            ).order_by(ActivityEvent.id):
+                logged_events.setdefault(event.entity_id, []).append(event)
+            for todo in todos:
+                # Toggles and moves logged since the deploy already describe part of
+                # the todo's history; backfill only the state it had before them.
+                events = logged_events.get(todo.id, [])
+                first_toggle = next((e for e in events if e.event_type != 'todo_moved'), None)
+                first_move = next((e for e in events if e.event_type == 'todo_moved'), None)
+                plan_id = first_move.plan_id if first_move else todo.plan_id
+                if first_toggle:
+                    was_completed = first_toggle.event_type == 'todo_reopened'
+                    completed_at = first_toggle.created_at
+                else:
+                    was_completed = todo.is_completed
+                    completed_at = todo.completed_at or todo.updated_at
+                
+                db.session.add(ActivityEvent(user_id=todo.user_id, plan_id=plan_id, event_type='todo_created',
+                                             entity_id=todo.id, open_delta=1, created_at=todo.created_at))
+                if was_completed:
+                    db.session.add(ActivityEvent(user_id=todo.user_id, plan_id=plan_id, event_type='todo_completed',
+                                                 entity_id=todo.id, open_delta=-1, created_at=completed_at))
+                added += 1
+            last_id = todos[-1].id
+            db.session.commit()
+    click.echo(f'{added} todos backfilled into the activity log.')
+
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def instrument_response(response):
+    if response.direct_passthrough or 'request_started' not in g:
+        return response
+    summary = '%s %s %s encoding=%s streamed=%s' % (
+        request.method, request.path, response.status_code,
+        response.content_encoding or 'identity', response.is_streamed)
+    response.response = measure_chunks(response.iter_encoded(), g.request_started, summary)
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    if (response.direct_passthrough or response.content_encoding
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(['br', 'gzip'])
+    if not encoding:
+        return response
+    
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    if response.is_streamed:
+        chunks = response.iter_encoded()
+        head, large_enough = peek_chunks(chunks, min_size)
+        if not large_enough:
+            response.set_data(head)
+            return response
+        response.response = compress_chunks(chain([head], chunks), encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(b''.join(compress_chunks([data], encoding)))
+    
+    response.content_encoding = encoding
+    return response
+
+
 @app.route('/')
 def index():
     if current_user.is_authenticated:
@@ -250,7 +925,8 @@ def index():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    total_ideas = Idea.query.filter_by(user_id=current_user.id).count()
+    total_ideas = Idea.query.filter_by(user_id=current_user.id).count() + \
+        ArchivedIdea.query.filter_by(user_id=current_user.id).count()
     active_ideas = Idea.query.filter_by(user_id=current_user.id, status='in_progress').count()
     pending_todos = Todo.query.filter_by(user_id=current_user.id, is_completed=False).count()
     recent_ideas = Idea.query.filter_by(user_id=current_user.id).order_by(Idea.created_at.desc()).limit(5).all()
@@ -261,7 +937,8 @@ def dashboard():
                          pending_todos=pending_todos,
                          completed_count=Idea.query.filter_by(user_id=current_user.id, status='completed').count(),
                          recent_ideas=recent_ideas,
-                         recent_plans=recent_plans)
+                         recent_plans=recent_plans,
+                         velocity=activity_series(current_user.id, days=7))
 
 
 @app.route('/ideas')
@@ -270,15 +947,24 @@ def ideas():
     status_filter = request.args.get('status', '')
     priority_filter = request.args.get('priority', '')
     
-    query = Idea.query.filter_by(user_id=current_user.id)
+    models = [Idea]
+    if status_filter == 'archived':
+        models.append(ArchivedIdea)
     
-    if status_filter:
-        query = query.filter_by(status=status_filter)
-    if priority_filter:
-        query = query.filter_by(priority=priority_filter)
+    ideas_list = []
+    for model in models:
+        query = model.query.filter_by(user_id=current_user.id)
+        
+        if status_filter:
+            query = query.filter_by(status=status_filter)
+        if priority_filter:
+            query = query.filter_by(priority=priority_filter)
+        
+        ideas_list += query.order_by(model.updated_at.desc()).all()
     
-    ideas_list = query.order_by(Idea.updated_at.desc()).all()
-    return render_template('ideas.html', ideas=ideas_list, 
+    if len(models) > 1:
+        ideas_list.sort(key=lambda idea: idea.updated_at or datetime.min, reverse=True)
+    return render_list('ideas.html', ideas=ideas_list, 
                          status_filter=status_filter, 
                          priority_filter=priority_filter)
 
@@ -289,6 +975,7 @@ VALID_PRIORITIES = ['low', 'medium', 'high']
 
 @app.route('/ideas/new', methods=['GET', 'POST'])
 @login_required
+@rate_limited
 def new_idea():
     if request.method == 'POST':
         title = request.form.get('title', '').strip()
@@ -322,6 +1009,8 @@ def new_idea():
         )
         
         db.session.add(idea)
+        db.session.flush()
+        record_activity('idea_created', entity_id=idea.id)
         db.session.commit()
         
         flash('Fikir başarıyla eklendi!', 'success')
@@ -333,12 +1022,14 @@ def new_idea():
 @app.route('/ideas/<int:idea_id>')
 @login_required
 def view_idea(idea_id):
-    idea = Idea.query.filter_by(id=idea_id, user_id=current_user.id).first_or_404()
+    idea = Idea.query.filter_by(id=idea_id, user_id=current_user.id).first() or \
+        ArchivedIdea.query.filter_by(id=idea_id, user_id=current_user.id).first_or_404()
     return render_template('idea_detail.html', idea=idea)
 
 
 @app.route('/ideas/<int:idea_id>/edit', methods=['GET', 'POST'])
 @login_required
+@rate_limited
 def edit_idea(idea_id):
     idea = Idea.query.filter_by(id=idea_id, user_id=current_user.id).first_or_404()
     
@@ -366,6 +1057,7 @@ def edit_idea(idea_id):
         idea.status = status
         idea.priority = priority
         
+        record_activity('idea_updated', entity_id=idea.id)
         db.session.commit()
         
         flash('Fikir başarıyla güncellendi!', 'success')
@@ -376,9 +1068,11 @@ def edit_idea(idea_id):
 
 @app.route('/ideas/<int:idea_id>/delete', methods=['POST'])
 @login_required
+@rate_limited
 def delete_idea(idea_id):
     idea = Idea.query.filter_by(id=idea_id, user_id=current_user.id).first_or_404()
     
+    record_activity('idea_deleted', entity_id=idea.id)
     db.session.delete(idea)
     db.session.commit()
     
@@ -386,6 +1080,26 @@ def delete_idea(idea_id):
     return redirect(url_for('ideas'))
 
 
+@app.route('/ideas/<int:idea_id>/restore', methods=['POST'])
+@login_required
+@rate_limited
+def restore_idea(idea_id):
+    archived = ArchivedIdea.query.filter_by(id=idea_id, user_id=current_user.id).first_or_404()
+    
+    values = {'status': 'draft', 'updated_at': datetime.utcnow()}
+    if db.session.get(Idea, archived.id) is not None:
+        values['id'] = None
+    idea = copy_row(archived, Idea, **values)
+    db.session.delete(archived)
+    db.session.add(idea)
+    db.session.flush()
+    record_activity('idea_updated', entity_id=idea.id)
+    db.session.commit()
+    
+    flash('Fikir arşivden geri alındı.', 'success')
+    return redirect(url_for('view_idea', idea_id=idea.id))
+
+
 @app.route('/plans')
 @login_required
 def plans():
@@ -400,13 +1114,14 @@ def plans():
         query = query.filter_by(priority=priority_filter)
     
     plans_list = query.order_by(Plan.updated_at.desc()).all()
-    return render_template('plans.html', plans=plans_list,
+    return render_list('plans.html', plans=plans_list,
                          status_filter=status_filter,
                          priority_filter=priority_filter)
 
 
 @app.route('/plans/new', methods=['GET', 'POST'])
 @login_required
+@rate_limited
 def new_plan():
     if request.method == 'POST':
         title = request.form.get('title', '').strip()
@@ -452,6 +1167,8 @@ def new_plan():
         )
         
         db.session.add(plan)
+        db.session.flush()
+        record_activity('plan_created', plan_id=plan.id, entity_id=plan.id)
         db.session.commit()
         
         flash('Plan başarıyla oluşturuldu!', 'success')
@@ -465,11 +1182,21 @@ def new_plan():
 def view_plan(plan_id):
     plan = Plan.query.filter_by(id=plan_id, user_id=current_user.id).first_or_404()
     plan_todos = Todo.query.filter_by(plan_id=plan_id).order_by(Todo.is_completed, Todo.priority.desc()).all()
-    return render_template('plan_detail.html', plan=plan, todos=plan_todos)
+    return render_template('plan_detail.html', plan=plan, todos=plan_todos,
+                         burndown=activity_series(current_user.id, plan.id))
+
+
+@app.route('/plans/<int:plan_id>/activity')
+@login_required
+def plan_activity(plan_id):
+    plan = Plan.query.filter_by(id=plan_id, user_id=current_user.id).first_or_404()
+    days = max(1, min(365, request.args.get('days', 14, type=int)))
+    return jsonify(plan_id=plan.id, series=activity_series(current_user.id, plan.id, days))
 
 
 @app.route('/plans/<int:plan_id>/edit', methods=['GET', 'POST'])
 @login_required
+@rate_limited
 def edit_plan(plan_id):
     plan = Plan.query.filter_by(id=plan_id, user_id=current_user.id).first_or_404()
     
@@ -507,6 +1234,7 @@ def edit_plan(plan_id):
         plan.priority = priority
         plan.progress = progress
         
+        record_activity('plan_updated', plan_id=plan.id, entity_id=plan.id)
         db.session.commit()
         
         flash('Plan başarıyla güncellendi!', 'success')
@@ -517,9 +1245,13 @@ def edit_plan(plan_id):
 
 @app.route('/plans/<int:plan_id>/delete', methods=['POST'])
 @login_required
+@rate_limited
 def delete_plan(plan_id):
     plan = Plan.query.filter_by(id=plan_id, user_id=current_user.id).first_or_404()
     
+    open_todos = plan.todos.filter_by(is_completed=False).count()
+    record_activity('plan_deleted', plan_id=plan.id, entity_id=plan.id, open_delta=-open_todos)
+    ArchivedTodo.query.filter_by(plan_id=plan.id).delete(synchronize_session=False)
     db.session.delete(plan)
     db.session.commit()
     
@@ -533,32 +1265,48 @@ def todos():
     priority_filter = request.args.get('priority', '')
     status_filter = request.args.get('status', '')
     plan_filter = request.args.get('plan', '')
+    show_archived = request.args.get('archived') == '1'
     
-    query = Todo.query.filter_by(user_id=current_user.id)
+    models = [Todo]
+    if show_archived and status_filter != 'pending':
+        models.append(ArchivedTodo)
     
-    if priority_filter:
-        query = query.filter_by(priority=priority_filter)
-    if status_filter == 'completed':
-        query = query.filter_by(is_completed=True)
-    elif status_filter == 'pending':
-        query = query.filter_by(is_completed=False)
-    if plan_filter:
-        try:
-            query = query.filter_by(plan_id=int(plan_filter))
-        except ValueError:
-            pass
+    todos_list = []
+    for model in models:
+        # Load each row's plan with the query so rendering the list does not
+        # issue one extra query per todo.
+        query = model.query.options(db.joinedload(model.plan)).filter_by(user_id=current_user.id)
+        
+        if priority_filter:
+            query = query.filter_by(priority=priority_filter)
+        if status_filter == 'completed':
+            query = query.filter_by(is_completed=True)
+        elif status_filter == 'pending':
+            query = query.filter_by(is_completed=False)
+        if plan_filter:
+            try:
+                query = query.filter_by(plan_id=int(plan_filter))
+            except ValueError:
+                pass
+        
+        todos_list += query.order_by(model.is_completed, model.priority.desc(), model.created_at.desc()).all()
     
-    todos_list = query.order_by(Todo.is_completed, Todo.priority.desc(), Todo.created_at.desc()).all()
+    if len(models) > 1:
+        todos_list.sort(key=lambda todo: todo.created_at or datetime.min, reverse=True)
+        todos_list.sort(key=lambda todo: todo.priority or '', reverse=True)
+        todos_list.sort(key=lambda todo: bool(todo.is_completed))
     user_plans = Plan.query.filter_by(user_id=current_user.id).order_by(Plan.title).all()
     
-    return render_template('todos.html', todos=todos_list, plans=user_plans,
+    return render_list('todos.html', todos=todos_list, plans=user_plans,
                          priority_filter=priority_filter,
                          status_filter=status_filter,
-                         plan_filter=plan_filter)
+                         plan_filter=plan_filter,
+                         show_archived=show_archived)
 
 
 @app.route('/todos/new', methods=['GET', 'POST'])
 @login_required
+@rate_limited
 def new_todo():
     user_plans = Plan.query.filter_by(user_id=current_user.id).order_by(Plan.title).all()
     
@@ -593,6 +1341,8 @@ def new_todo():
         )
         
         db.session.add(todo)
+        db.session.flush()
+        record_activity('todo_created', plan_id=todo.plan_id, entity_id=todo.id, open_delta=1)
         db.session.commit()
         
         flash('Görev başarıyla eklendi!', 'success')
@@ -603,6 +1353,7 @@ def new_todo():
 
 @app.route('/todos/<int:todo_id>/edit', methods=['GET', 'POST'])
 @login_required
+@rate_limited
 def edit_todo(todo_id):
     todo = Todo.query.filter_by(id=todo_id, user_id=current_user.id).first_or_404()
     user_plans = Plan.query.filter_by(user_id=current_user.id).order_by(Plan.title).all()
@@ -628,10 +1379,16 @@ def edit_todo(todo_id):
             except ValueError:
                 due_date = todo.due_date
         
+        new_plan_id = int(plan_id) if plan_id else None
+        if new_plan_id != todo.plan_id:
+            open_delta = 0 if todo.is_completed else 1
+            record_activity('todo_moved', plan_id=todo.plan_id, entity_id=todo.id, open_delta=-open_delta)
+            record_activity('todo_moved', plan_id=new_plan_id, entity_id=todo.id, open_delta=open_delta)
+        
         todo.title = title
         todo.description = request.form.get('description', '').strip()
         todo.priority = priority
-        todo.plan_id = int(plan_id) if plan_id else None
+        todo.plan_id = new_plan_id
         todo.due_date = due_date
         
         db.session.commit()
@@ -644,6 +1401,7 @@ def edit_todo(todo_id):
 
 @app.route('/todos/<int:todo_id>/toggle', methods=['POST'])
 @login_required
+@rate_limited
 def toggle_todo(todo_id):
     todo = Todo.query.filter_by(id=todo_id, user_id=current_user.id).first_or_404()
     
@@ -653,6 +1411,10 @@ def toggle_todo(todo_id):
     else:
         todo.completed_at = None
     
+    if todo.is_completed:
+        record_activity('todo_completed', plan_id=todo.plan_id, entity_id=todo.id, open_delta=-1)
+    else:
+        record_activity('todo_reopened', plan_id=todo.plan_id, entity_id=todo.id, open_delta=1)
     db.session.commit()
     
     status = 'tamamlandı' if todo.is_completed else 'beklemede'
@@ -664,9 +1426,12 @@ def toggle_todo(todo_id):
 
 @app.route('/todos/<int:todo_id>/delete', methods=['POST'])
 @login_required
+@rate_limited
 def delete_todo(todo_id):
     todo = Todo.query.filter_by(id=todo_id, user_id=current_user.id).first_or_404()
     
+    record_activity('todo_deleted', plan_id=todo.plan_id, entity_id=todo.id,
+                    open_delta=0 if todo.is_completed else -1)
     db.session.delete(todo)
     db.session.commit()
     
@@ -674,6 +1439,25 @@ def delete_todo(todo_id):
     return redirect(url_for('todos'))
 
 
+@app.route('/todos/<int:todo_id>/restore', methods=['POST'])
+@login_required
+@rate_limited
+def restore_todo(todo_id):
+    archived = ArchivedTodo.query.filter_by(id=todo_id, user_id=current_user.id).first_or_404()
+    
+    # Touching updated_at keeps the archive job from moving it straight back.
+    values = {'updated_at': datetime.utcnow()}
+    if db.session.get(Todo, archived.id) is not None:
+        values['id'] = None
+    todo = copy_row(archived, Todo, **values)
+    db.session.delete(archived)
+    db.session.add(todo)
+    db.session.commit()
+    
+    flash('Görev arşivden geri alındı.', 'success')
+    return redirect(url_for('todos', archived='1'))
+
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -690,7 +1474,20 @@ def login():
         
         user = User.query.filter_by(email=email).first()
         
-        if user and user.check_password(password):
+        try:
+            password_ok = user is not None and user.check_password(password)
+        except (AuthBusyError, TimeoutError):
+            flash('Şu anda çok fazla giriş isteği var, lütfen biraz sonra tekrar deneyin.', 'error')
+            return render_template('login.html'), 503, {'Retry-After': '1'}
+        
+        if password_ok:
+            if user.password_needs_rehash:
+                # The upgrade can wait for a later login if the pool is busy.
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except (AuthBusyError, TimeoutError):
+                    pass
             login_user(user, remember=remember)
             next_page = request.args.get('next')
             if next_page and is_safe_url(next_page):
@@ -731,19 +1528,23 @@ def register():
             flash('Şifreler eşleşmiyor.', 'error')
             return render_template('register.html')
         
-        if User.query.filter_by(email=email).first():
-            flash('Bu e-posta adresi zaten kullanılıyor.', 'error')
-            return render_template('register.html')
-        
-        if User.query.filter_by(username=username).first():
-            flash('Bu kullanıcı adı zaten kullanılıyor.', 'error')
-            return render_template('register.html')
-        
         user = User(username=username, email=email)
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except (AuthBusyError, TimeoutError):
+            flash('Şu anda çok fazla istek var, lütfen biraz sonra tekrar deneyin.', 'error')
+            return render_template('register.html'), 503, {'Retry-After': '1'}
         
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if duplicate_user_field(e) == 'email':
+                flash('Bu e-posta adresi zaten kullanılıyor.', 'error')
+            else:
+                flash('Bu kullanıcı adı zaten kullanılıyor.', 'error')
+            return render_template('register.html')
         
         flash('Hesabınız oluşturuldu! Şimdi giriş yapabilirsiniz.', 'success')
         return redirect(url_for('login'))
@@ -759,6 +1560,27 @@ def logout():
     return redirect(url_for('index'))
 
 
+@app.route('/metrics')
+def metrics():
+    global limiter_errors
+    try:
+        values = limiter.metrics()
+    except sqlite3.Error:
+        limiter_errors += 1
+        values = {'allowed': 0, 'rejected_rate': 0, 'rejected_concurrency': 0, 'slots_in_use': 0}
+    lines = [
+        '# TYPE devnotebook_limiter_requests_total counter',
+        f'devnotebook_limiter_requests_total{{result="allowed"}} {values["allowed"]}',
+        f'devnotebook_limiter_requests_total{{result="rejected_rate"}} {values["rejected_rate"]}',
+        f'devnotebook_limiter_requests_total{{result="rejected_concurrency"}} {values["rejected_concurrency"]}',
+        '# TYPE devnotebook_limiter_write_slots_in_use gauge',
+        f'devnotebook_limiter_write_slots_in_use {values["slots_in_use"]}',
+        '# TYPE devnotebook_limiter_backend_errors_total counter',
+        f'devnotebook_limiter_backend_errors_total {limiter_errors}',
+    ]
+    return '\n'.join(lines) + '\n', 200, {'Content-Type': 'text/plain; version=0.0.4'}
+
+
 with app.app_context():
     db.create_all()
 